@@ -6,6 +6,20 @@ from datetime import timedelta
 from werkzeug.middleware.proxy_fix import ProxyFix
 from dotenv import load_dotenv
 
+def env_int(name, default):
+    """
+    環境変数 name を整数として返します。
+    ・未設定または空文字の場合は default を返します。
+    ・整数として読めない場合は、どの環境変数が原因か分かるメッセージで ValueError を送出します。
+    """
+    value = os.environ.get(name, '').strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'環境変数 {name} には整数を指定してください（現在の値: {value!r}）') from None
+
 def create_app():
     """
     Flaskアプリケーションのファクトリ関数です。
@@ -35,5 +49,19 @@ def create_app():
     # app/routes.py内の'main'ブループリントをインポートし、アプリケーションに登録しています。
     from .routes import main as main_blueprint
     app.register_blueprint(main_blueprint)
-    
+
+    # レスポンスの圧縮と、静的ファイルの事前圧縮版の配信を登録します。
+    from . import compression
+    compression.init_app(app)
+
+    # データベースのバックアップ（CLIコマンドと定期バックアップ）を登録します。
+    from . import backup
+    backup.init_app(app)
+
+    # Geminiクライアントは最初に使われるまで初期化しません。
+    # 環境変数 "GEMINI_WARMUP" が '1' の場合のみ、起動をブロックせずにバックグラウンドで初期化しておきます。
+    if os.environ.get('GEMINI_WARMUP', '0') == '1':
+        from . import gemini
+        gemini.warm_up()
+
     return app
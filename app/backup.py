@@ -0,0 +1,330 @@
+# app/backup.py
+
+import glob
+import gzip
+import os
+import shutil
+import sqlite3 as sql
+import tempfile
+import threading
+import time
+from datetime import datetime
+from urllib.request import pathname2url
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from .routes import DATABASE
+
+# スナップショットのファイル名です。（例: hajimeteno-20250101-120000-123456.db.gz）
+# 同じ秒に複数回作成しても重ならないよう、マイクロ秒まで含めます。
+SNAPSHOT_PREFIX = 'hajimeteno-'
+SNAPSHOT_TIME_FORMAT = '%Y%m%d-%H%M%S-%f'
+
+# 復元を許可するために、スナップショットに必要なテーブルです。
+REQUIRED_TABLES = ('questions', 'answers')
+
+# 一度にコピーするページ数と、ステップ間の待ち時間（秒）です。
+# 1ステップの間だけ読み取りロックを持つため、小さく刻むほどリクエストを待たせにくくなります。
+BACKUP_PAGES = 64
+BACKUP_PAUSE = 0.005
+
+# ロールバックジャーナルモードでコピーがやり直しになった場合の設定です。
+# 1回の試行でやり直しが BACKUP_MAX_RESTARTS 回を超えたら、BACKUP_BACKOFF 秒（試行ごとに倍）待ってから
+# 1ステップのページ数を4倍にして再試行します。BACKUP_MAX_ATTEMPTS 回失敗したら一度に全ページをコピーします。
+BACKUP_MAX_RESTARTS = 3
+BACKUP_MAX_ATTEMPTS = 4
+BACKUP_BACKOFF = 0.5
+
+class _BackupRestarted(Exception):
+    """ページ単位のコピーのやり直しが上限を超えたことを表します。"""
+
+def backup_database(source, destination, pages=BACKUP_PAGES, pause=BACKUP_PAUSE,
+                    max_restarts=BACKUP_MAX_RESTARTS, max_attempts=BACKUP_MAX_ATTEMPTS,
+                    backoff=BACKUP_BACKOFF):
+    """
+    SQLiteのオンラインバックアップAPIで source を destination にコピーし、
+    {'wal': WALモードだったか, 'restarts': やり直しの回数, 'fallback': 一度に全ページをコピーしたか} を返します。
+    ・WALモードの場合は、読み取りトランザクションを開いたまま pages ページずつコピーします。
+      同じ時点の内容を読み続けるためやり直しは起きず、WALでは読み取りが書き込みを妨げないため、
+      ask / answer の書き込みを待たせずに完了します。
+    ・ロールバックジャーナルモードでは、ステップの間に pause 秒休んで書き込みを通しますが、
+      別の接続から書き込みがあるとコピーが最初からやり直しになります。やり直しが続く場合は
+      待ち時間を置いてより大きなステップで再試行し、それでも完了しなければ一度に全ページをコピーします。
+      （その間だけ書き込みを待たせます）
+    """
+    result = {'wal': False, 'restarts': 0, 'fallback': False}
+
+    src = sql.connect(source)
+    dst = sql.connect(destination)
+    try:
+        result['wal'] = src.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        if result['wal']:
+            src.execute("BEGIN")
+            src.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+            try:
+                src.backup(dst, pages=pages, progress=_progress(pause, None, result))
+            finally:
+                src.rollback()
+            return result
+
+        step = pages
+        for attempt in range(max_attempts):
+            if attempt:
+                time.sleep(backoff * 2 ** (attempt - 1))
+                step *= 4
+            try:
+                src.backup(dst, pages=step, progress=_progress(pause, max_restarts, result))
+                return result
+            except _BackupRestarted:
+                continue
+
+        result['fallback'] = True
+        src.backup(dst, pages=-1)
+        return result
+    finally:
+        dst.close()
+        src.close()
+
+def _progress(pause, max_restarts, result):
+    """
+    backup() に渡す進捗コールバックを作成します。
+    ・ステップの間に pause 秒休みます。
+    ・残りページ数が増えた場合はコピーが最初からやり直しになっているため、result['restarts'] に数えます。
+      この試行でのやり直しが max_restarts 回を超えたら _BackupRestarted を送出して試行を打ち切ります。
+    """
+    state = {'remaining': None, 'restarts': 0}
+
+    def progress(status, remaining, total):
+        if state['remaining'] is not None and remaining > state['remaining']:
+            state['restarts'] += 1
+            result['restarts'] += 1
+            if max_restarts is not None and state['restarts'] > max_restarts:
+                raise _BackupRestarted()
+        state['remaining'] = remaining
+        if remaining and pause:
+            time.sleep(pause)
+
+    return progress
+
+def create_snapshot(backup_dir, source=DATABASE, compress=True, pages=BACKUP_PAGES, pause=BACKUP_PAUSE):
+    """
+    backup_dir にタイムスタンプ付きのスナップショットを作成し、(パス, backup_database の結果) を返します。
+    ・一時ファイルにバックアップしてから圧縮し、最後に名前を付けるため、途中で失敗しても壊れたファイルは残りません。
+    ・既存のスナップショットは上書きしません。
+    """
+    os.makedirs(backup_dir, exist_ok=True)
+
+    fd, tmp_db = tempfile.mkstemp(suffix='.db', dir=backup_dir)
+    os.close(fd)
+    tmp_gz = tmp_db + '.gz'
+    try:
+        result = backup_database(source, tmp_db, pages=pages, pause=pause)
+        # WALモードのデータベースからコピーすると、スナップショットもWALモードになります。
+        # 1ファイルで完結させるため、ロールバックジャーナルモードに戻しておきます。
+        con = sql.connect(tmp_db)
+        try:
+            con.execute("PRAGMA journal_mode = DELETE")
+        finally:
+            con.close()
+        if compress:
+            # 圧縮はデータベースのロックとは無関係に行われます。
+            with open(tmp_db, 'rb') as f_in, gzip.open(tmp_gz, 'wb') as f_out:
+                shutil.copyfileobj(f_in, f_out)
+        path = _publish(tmp_gz if compress else tmp_db, backup_dir, '.db.gz' if compress else '.db')
+    finally:
+        for tmp in (tmp_db, tmp_gz, tmp_db + '-wal', tmp_db + '-shm'):
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    return path, result
+
+def _publish(tmp, backup_dir, suffix):
+    """
+    一時ファイル tmp にスナップショットの名前を付け、そのパスを返します。
+    os.link は同名のファイルがあると失敗するため、他のバックアップの結果を上書きすることはありません。
+    """
+    while True:
+        name = SNAPSHOT_PREFIX + datetime.now().strftime(SNAPSHOT_TIME_FORMAT) + suffix
+        path = os.path.join(backup_dir, name)
+        try:
+            os.link(tmp, path)
+        except FileExistsError:
+            continue
+        os.remove(tmp)
+        return path
+
+def list_snapshots(backup_dir):
+    """
+    backup_dir 内のスナップショットを古い順に返します。
+    """
+    paths = glob.glob(os.path.join(backup_dir, SNAPSHOT_PREFIX + '*.db'))
+    paths += glob.glob(os.path.join(backup_dir, SNAPSHOT_PREFIX + '*.db.gz'))
+    return sorted(paths, key=os.path.basename)
+
+def prune_snapshots(backup_dir, keep):
+    """
+    新しい順に keep 件だけ残し、それより古いスナップショットを削除します。削除したパスを返します。
+    keep が0以下の場合は何も削除しません。
+    """
+    snapshots = list_snapshots(backup_dir)
+    removed = snapshots[:-keep] if keep > 0 else []
+    for path in removed:
+        os.remove(path)
+    return removed
+
+def _open_snapshot(path, workdir):
+    """
+    スナップショットを読み取り可能な .db ファイルとして返します。圧縮されている場合は workdir に展開します。
+    """
+    if not path.endswith('.gz'):
+        return path
+    extracted = os.path.join(workdir, os.path.basename(path)[:-3])
+    with gzip.open(path, 'rb') as f_in, open(extracted, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    return extracted
+
+def _connect_readonly(path):
+    """
+    path を読み取り専用で開きます。ファイルが存在しない場合に空のデータベースを作らないようにするためです。
+    """
+    return sql.connect(f'file:{pathname2url(os.path.abspath(path))}?mode=ro', uri=True)
+
+def verify_snapshot(path):
+    """
+    スナップショットを検査し、(integrity_checkの結果, {テーブル名: 行数}) を返します。
+    ・integrity_check が問題なければ結果は 'ok' です。
+    ・ファイルがなければ FileNotFoundError、データベースでなければ sqlite3.DatabaseError を送出します。
+    """
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f'スナップショットが見つかりません: {path}')
+    with tempfile.TemporaryDirectory() as workdir:
+        con = _connect_readonly(_open_snapshot(path, workdir))
+        try:
+            integrity = con.execute("PRAGMA integrity_check").fetchone()[0]
+            tables = [row[0] for row in con.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )]
+            counts = {table: con.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0] for table in tables}
+        finally:
+            con.close()
+    return integrity, counts
+
+def restore_snapshot(path, destination=DATABASE):
+    """
+    スナップショットを検査したうえで、バックアップAPIを使って destination に書き戻します。
+    integrity_check に失敗した場合や、必要なテーブルがない場合は ValueError を送出し、destination は変更しません。
+    """
+    integrity, counts = verify_snapshot(path)
+    if integrity != 'ok':
+        raise ValueError(f'integrity_check に失敗しました: {integrity}')
+    missing = [table for table in REQUIRED_TABLES if table not in counts]
+    if missing:
+        raise ValueError(f'必要なテーブルがありません: {", ".join(missing)}')
+    with tempfile.TemporaryDirectory() as workdir:
+        src = _connect_readonly(_open_snapshot(path, workdir))
+        dst = sql.connect(destination)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+
+def start_scheduler(backup_dir, interval_minutes, keep, source=DATABASE):
+    """
+    interval_minutes ごとにスナップショットを作成し、keep 件を超えた古いものを削除するスレッドを開始します。
+    戻り値の threading.Event を set するとスレッドは停止します。
+    """
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval_minutes * 60):
+            try:
+                path, result = create_snapshot(backup_dir, source=source)
+                prune_snapshots(backup_dir, keep)
+                print(f"Backup created: {path} ({describe_result(result)})")
+            except Exception as e:
+                print(f"Backup error: {e}")
+
+    threading.Thread(target=_run, name='backup-scheduler', daemon=True).start()
+    return stop
+
+def describe_result(result):
+    """
+    backup_database の結果を、ログやCLIに表示するための短い文字列にします。
+    """
+    mode = 'WAL' if result['wal'] else 'rollback journal'
+    fallback = '、一括コピーに切り替え' if result['fallback'] else ''
+    return f"{mode}、やり直し {result['restarts']} 回{fallback}"
+
+def init_app(app):
+    """
+    バックアップの設定とCLIコマンドを登録します。
+    環境変数 "BACKUP_INTERVAL_MINUTES" が設定されている場合は、定期バックアップのスレッドも開始します。
+    未設定または空の環境変数は既定値として扱い、整数でない値や負の値は ValueError にします。
+    """
+    from . import env_int
+    app.config.setdefault('BACKUP_DIR', os.environ.get('BACKUP_DIR') or 'backups')
+    app.config.setdefault('BACKUP_RETENTION', env_int('BACKUP_RETENTION', 24))
+    app.config.setdefault('BACKUP_INTERVAL_MINUTES', env_int('BACKUP_INTERVAL_MINUTES', 0))
+    for key in ('BACKUP_RETENTION', 'BACKUP_INTERVAL_MINUTES'):
+        if app.config[key] < 0:
+            raise ValueError(f'{key} には0以上の整数を指定してください（現在の値: {app.config[key]}）')
+
+    if app.config['BACKUP_INTERVAL_MINUTES'] > 0:
+        start_scheduler(app.config['BACKUP_DIR'],
+                        app.config['BACKUP_INTERVAL_MINUTES'],
+                        app.config['BACKUP_RETENTION'])
+
+    app.cli.add_command(backup_cli)
+
+@click.group('backup')
+def backup_cli():
+    """hajimeteno.db のバックアップを作成・検査・復元します。"""
+
+@backup_cli.command('create')
+@click.option('--no-compress', is_flag=True, help='gzipで圧縮しない')
+@with_appcontext
+def create_command(no_compress):
+    """スナップショットを作成し、保存件数を超えた古いものを削除します。"""
+    backup_dir = current_app.config['BACKUP_DIR']
+    path, result = create_snapshot(backup_dir, compress=not no_compress)
+    click.echo(f"作成しました: {path} ({describe_result(result)})")
+    for removed in prune_snapshots(backup_dir, current_app.config['BACKUP_RETENTION']):
+        click.echo(f"削除しました: {removed}")
+
+@backup_cli.command('list')
+@with_appcontext
+def list_command():
+    """スナップショットの一覧を表示します。"""
+    for path in list_snapshots(current_app.config['BACKUP_DIR']):
+        click.echo(f"{path}  ({os.path.getsize(path)} bytes)")
+
+@backup_cli.command('verify')
+@click.argument('path')
+def verify_command(path):
+    """integrity_check と各テーブルの行数でスナップショットを検査します。"""
+    try:
+        integrity, counts = verify_snapshot(path)
+    except (OSError, sql.DatabaseError) as e:
+        raise click.ClickException(f'スナップショットを読み込めません: {e}')
+    click.echo(f"integrity_check: {integrity}")
+    for table, count in counts.items():
+        click.echo(f"  {table}: {count} 行")
+    if integrity != 'ok':
+        raise click.exceptions.Exit(1)
+
+@backup_cli.command('restore')
+@click.argument('path')
+@click.option('--yes', is_flag=True, help='確認せずに復元する')
+def restore_command(path, yes):
+    """スナップショットを検査してから hajimeteno.db に復元します。"""
+    if not yes:
+        click.confirm(f"{DATABASE} を {path} の内容で上書きします。よろしいですか？", abort=True)
+    try:
+        restore_snapshot(path)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    except (OSError, sql.DatabaseError) as e:
+        raise click.ClickException(f'スナップショットを読み込めません: {e}')
+    click.echo(f"復元しました: {path} -> {DATABASE}")
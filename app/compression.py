@@ -0,0 +1,186 @@
+# app/compression.py
+
+import gzip
+import mimetypes
+import os
+
+import click
+from flask import current_app, request, send_from_directory
+from flask.cli import with_appcontext
+from werkzeug.security import safe_join
+
+# brotli は任意の依存ライブラリです。インストールされていない場合は gzip のみを使います。
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# 圧縮の対象とするContent-Typeの一覧です。（PNGなどの画像はすでに圧縮済みのため対象外）
+COMPRESSIBLE_MIMETYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+
+# 事前圧縮版を作成する静的ファイルの拡張子です。
+PRECOMPRESS_EXTENSIONS = ('.css', '.js', '.html', '.txt', '.json', '.svg')
+
+def init_app(app):
+    """
+    アプリケーションにレスポンス圧縮と静的ファイルの事前圧縮版の配信を登録します。
+    ・HTMLなどの動的なレスポンスは、クライアントの Accept-Encoding に応じて brotli / gzip で圧縮します。
+    ・/static では 'styles.css.br' や 'styles.css.gz' があればそれを返し、なければ通常通り配信します。
+    ・'flask compress-static' コマンドで事前圧縮版を作成できます。
+    ・しきい値と圧縮レベルは環境変数 "COMPRESS_MIN_SIZE" / "COMPRESS_LEVEL" で変更できます。
+    """
+    from . import env_int
+    app.config.setdefault('COMPRESS_MIN_SIZE', env_int('COMPRESS_MIN_SIZE', 500))
+    app.config.setdefault('COMPRESS_LEVEL', env_int('COMPRESS_LEVEL', 6))
+    if not 1 <= app.config['COMPRESS_LEVEL'] <= 9:
+        raise ValueError(f"COMPRESS_LEVEL は1〜9で指定してください（現在の値: {app.config['COMPRESS_LEVEL']}）")
+    # 静的ファイルはURLにバージョンを含まないため、短めにキャッシュさせて以降はETagで再検証させます。
+    # Flaskの既定値は None（毎回再検証）のため、setdefault ではなく未設定の場合に代入します。
+    if app.config.get('SEND_FILE_MAX_AGE_DEFAULT') is None:
+        app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 3600
+
+    app.after_request(_compress_response)
+
+    def static(filename):
+        """
+        事前圧縮版があればそれを、なければ元のファイルを返す静的ファイル用のルートです。
+        ETag・Last-Modified・Range は send_from_directory がそのまま処理します。
+        """
+        response = _send_precompressed(app, filename)
+        if response is None:
+            response = app.send_static_file(filename)
+            # 事前圧縮版があるファイルは、Accept-Encodingによって返す内容が変わります。
+            if _precompressed_variants(app, filename):
+                response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = static
+    app.cli.add_command(compress_static_command)
+
+def _accepted_encodings():
+    """
+    クライアントが受け付ける圧縮方式を優先度の高い順に返します。
+    同じ品質値の場合は圧縮率の高い brotli を優先します。
+    """
+    candidates = []
+    if brotli is not None:
+        candidates.append('br')
+    candidates.append('gzip')
+    accepted = [(request.accept_encodings[name], name) for name in candidates]
+    accepted = [item for item in accepted if item[0] > 0]
+    accepted.sort(key=lambda item: -item[0])
+    return [name for _, name in accepted]
+
+def _compress(data, encoding, level):
+    """
+    指定された方式でバイト列を圧縮します。
+    """
+    if encoding == 'br':
+        # brotliの品質は0〜11のため、gzipのレベル(1〜9)を大まかに対応させます。
+        return brotli.compress(data, quality=min(11, level + 2))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def _compress_response(response):
+    """
+    after_request で呼ばれ、条件を満たすレスポンスを圧縮します。
+    ・対象はステータス200、対象のContent-Type、しきい値以上のサイズのレスポンスのみです。
+    ・ファイル配信（direct_passthrough）や、すでに圧縮済みのレスポンスには何もしません。
+    ・HTMLには弱いETagを付け、内容が変わっていなければ 304 を返します。
+    """
+    if (response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    # 304 にも 200 と同じ Vary が必要なため、条件付きリクエストの処理より先に付けます。
+    response.vary.add('Accept-Encoding')
+
+    # カテゴリーの再表示などで内容が同じ場合は、本文を送らずに 304 を返します。
+    if request.method in ('GET', 'HEAD'):
+        response.add_etag(weak=True)
+        response.make_conditional(request)
+        if response.status_code != 200:
+            return response
+
+    data = response.get_data()
+    if len(data) < current_app.config['COMPRESS_MIN_SIZE']:
+        return response
+
+    encodings = _accepted_encodings()
+    if not encodings:
+        return response
+
+    encoding = encodings[0]
+    response.set_data(_compress(data, encoding, current_app.config['COMPRESS_LEVEL']))
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def _precompressed_variants(app, filename):
+    """
+    filename に対応する事前圧縮版のうち、元のファイル以降に作成されたものを {圧縮方式: ファイル名} で返します。
+    """
+    source = safe_join(app.static_folder, filename)
+    if source is None or not os.path.isfile(source):
+        return {}
+    source_mtime = os.path.getmtime(source)
+
+    variants = {}
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        path = source + suffix
+        if os.path.isfile(path) and os.path.getmtime(path) >= source_mtime:
+            variants[encoding] = filename + suffix
+    return variants
+
+def _send_precompressed(app, filename):
+    """
+    クライアントが受け付ける事前圧縮版があれば、それを配信するレスポンスを返します。
+    見つからない場合は None を返します。
+    """
+    variants = _precompressed_variants(app, filename)
+    if not variants:
+        return None
+
+    for encoding in ['br', 'gzip']:
+        if encoding not in variants or request.accept_encodings[encoding] <= 0:
+            continue
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+        response = send_from_directory(app.static_folder, variants[encoding],
+                                       mimetype=mimetype,
+                                       max_age=app.get_send_file_max_age(filename))
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        return response
+    return None
+
+@click.command('compress-static')
+@click.option('--level', default=9, show_default=True, help='gzipの圧縮レベル')
+@with_appcontext
+def compress_static_command(level):
+    """
+    static フォルダ内のテキストファイルについて、.gz と .br（brotliがあれば）の事前圧縮版を作成します。
+    """
+    static_folder = current_app.static_folder
+    min_size = current_app.config['COMPRESS_MIN_SIZE']
+
+    for dirpath, _, filenames in os.walk(static_folder):
+        for name in filenames:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(dirpath, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < min_size:
+                continue
+
+            outputs = [('.gz', gzip.compress(data, compresslevel=level, mtime=0))]
+            if brotli is not None:
+                outputs.append(('.br', brotli.compress(data, quality=11)))
+            for suffix, compressed in outputs:
+                with open(path + suffix, 'wb') as f:
+                    f.write(compressed)
+                click.echo(f"{os.path.relpath(path + suffix, static_folder)}: {len(data)} -> {len(compressed)} bytes")
@@ -0,0 +1,58 @@
+# app/gemini.py
+
+import os
+import threading
+
+# 使用するGeminiのモデル名です。
+MODEL_NAME = 'gemini-2.0-flash-exp'
+
+# 初期化済みのモデルと、その状態を保持します。
+# google.generativeai のインポートは重いため、最初に必要になるまで行いません。
+_model = None
+_status = 'cold'  # 'cold' / 'warming' / 'ready' / 'error'
+_lock = threading.Lock()
+
+def get_model():
+    """
+    Geminiのモデルを返します。
+    ・初回呼び出し時にだけ google.generativeai をインポートし、APIキーを設定します。
+    ・複数スレッドから同時に呼ばれても初期化は一度だけ行われます。
+    """
+    global _model, _status
+    if _model is None:
+        with _lock:
+            if _model is None:
+                try:
+                    import google.generativeai as genai
+                    genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
+                    _model = genai.GenerativeModel(MODEL_NAME)
+                    _status = 'ready'
+                except Exception:
+                    _status = 'error'
+                    raise
+    return _model
+
+def warm_up():
+    """
+    バックグラウンドのスレッドでモデルを初期化します。
+    ワーカー起動をブロックせずに、最初のGeminiリクエストの待ち時間を減らすために使います。
+    """
+    global _status
+
+    def _run():
+        try:
+            get_model()
+        except Exception as e:
+            print(f"Gemini warm-up error: {e}")
+
+    with _lock:
+        if _model is not None or _status == 'warming':
+            return
+        _status = 'warming'
+    threading.Thread(target=_run, name='gemini-warm-up', daemon=True).start()
+
+def status():
+    """
+    Geminiクライアントの初期化状態を文字列で返します。
+    """
+    return _status
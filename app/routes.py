@@ -1,12 +1,11 @@
 # app/routes.py
 
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, jsonify
 import sqlite3 as sql
 from functools import wraps 
 from datetime import datetime
 import pytz
-import google.generativeai as genai
-import os
+from . import gemini
 
 # 質問に用いる固定のカテゴリーの一覧です。（「すべて」は含めず、後で全件表示として扱います）
 CATEGORIES = [
@@ -22,10 +21,8 @@ CATEGORIES = [
 # Flaskのブループリントを作成し、ルーティングをグループ化しています。
 main = Blueprint('main', __name__)
 
-# Gemini APIの設定
-GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
-genai.configure(api_key=GEMINI_API_KEY)
-model = genai.GenerativeModel('gemini-2.0-flash-exp')
+# SQLite3のデータベースファイルです。
+DATABASE = 'hajimeteno.db'
 
 def get_db_connection():
     """
@@ -34,7 +31,7 @@ def get_db_connection():
     ・日本標準時（JST）を返す CURRENT_TIMESTAMP 関数を登録
     """
     # データベースファイルに接続
-    con = sql.connect('hajimeteno.db')
+    con = sql.connect(DATABASE)
     # 結果を辞書形式（キーでアクセスできる）にするための設定
     con.row_factory = sql.Row
     # タイムゾーンを日本標準時に設定（SQLiteのPRAGMA timezoneは参考情報）
@@ -110,6 +107,33 @@ def logout():
     flash('ログアウトしました。')
     return redirect(url_for('main.login'))
 
+# --------------- 監視用のルート ---------------
+
+@main.route('/healthz')
+def healthz():
+    """
+    ロードバランサーやGunicornの監視から使う、準備完了チェック用のルートです。
+    ・データベースに接続できれば 200、できなければ 503 を返します。
+    ・Geminiは遅延初期化のため、その状態は参考情報として返すだけで判定には使いません。
+    """
+    # 監視からの呼び出しでファイルを作成しないよう、読み取り専用で開きます。
+    con = None
+    try:
+        con = sql.connect(f'file:{DATABASE}?mode=ro', uri=True)
+        con.execute("SELECT 1 FROM questions LIMIT 1").fetchone()
+        database = 'ok'
+    except sql.Error as e:
+        print(f"Health check database error: {e}")
+        database = 'error'
+    finally:
+        if con is not None:
+            con.close()
+
+    status_code = 200 if database == 'ok' else 503
+    return jsonify(status='ok' if status_code == 200 else 'unavailable',
+                   database=database,
+                   gemini=gemini.status()), status_code
+
 # --------------- 質問・回答機能関連のルート ---------------
 
 @main.route('/')
@@ -287,7 +311,7 @@ def ask():
                 ]
                 
                 # Gemini APIで回答を生成
-                response = model.generate_content(
+                response = gemini.get_model().generate_content(
                     prompt,
                     safety_settings=safety_settings,
                     generation_config={
@@ -355,7 +379,7 @@ def answer(question_id):
             
             # Gemini APIで回答を生成
             try:
-                response = model.generate_content(prompt)
+                response = gemini.get_model().generate_content(prompt)
                 gemini_answer = response.text
                 
                 # Geminiの回答を保存
@@ -392,7 +416,7 @@ def answer(question_id):
             
             # Gemini APIで回答を生成
             try:
-                response = model.generate_content(prompt)
+                response = gemini.get_model().generate_content(prompt)
                 gemini_answer = response.text
                 
                 # Geminiの回答を保存
@@ -428,7 +452,7 @@ def answer(question_id):
             
             # Gemini APIで回答を生成
             try:
-                response = model.generate_content(prompt)
+                response = gemini.get_model().generate_content(prompt)
                 gemini_answer = response.text
                 
                 # Geminiの回答を保存
@@ -466,7 +490,7 @@ def answer(question_id):
             
             # Gemini APIで回答を生成
             try:
-                response = model.generate_content(prompt)
+                response = gemini.get_model().generate_content(prompt)
                 gemini_answer = response.text
                 
                 # Geminiの回答を保存
@@ -505,7 +529,7 @@ def answer(question_id):
             
             # Gemini APIで回答を生成
             try:
-                response = model.generate_content(prompt)
+                response = gemini.get_model().generate_content(prompt)
                 gemini_answer = response.text
                 
                 # Geminiの回答を保存
@@ -544,7 +568,7 @@ def answer(question_id):
             
             # Gemini APIで回答を生成
             try:
-                response = model.generate_content(prompt)
+                response = gemini.get_model().generate_content(prompt)
                 gemini_answer = response.text
                 
                 # Geminiの回答を保存
@@ -650,7 +674,7 @@ def get_gemini_comment():
         ]
 
         # Gemini APIで回答を生成
-        response = model.generate_content(
+        response = gemini.get_model().generate_content(
             prompt,
             safety_settings=safety_settings,
             generation_config={
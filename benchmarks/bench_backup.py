@@ -0,0 +1,136 @@
+# benchmarks/bench_backup.py
+"""
+オンラインバックアップがリクエストの遅延に与える影響のベンチマークです。
+シードしたデータベースに対して、複数スレッドから質問一覧の表示と回答の投稿を繰り返し、
+以下の3つの状況でのレイテンシ（p50 / p99）を比較します。
+
+  * バックアップなし
+  * 小さなページ単位でのバックアップ（app.backup の既定値）
+  * 一度に全ページをコピーするバックアップ（ファイルコピーに近い動作）
+
+「during load」列は、負荷をかけ続けている間にバックアップが完了したかどうか、
+「restarts」「fallback」列は、書き込みによるコピーのやり直しの回数と、一括コピーに切り替えたかどうかを表します。
+--journal-mode wal を指定すると、WALモードのデータベースで計測します。
+
+使い方:
+    python benchmarks/bench_backup.py [--questions 20000] [--threads 4] [--seconds 5] [--journal-mode wal]
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from seed import create_database
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
+
+def run_load(app, question_ids, threads, seconds, backup=None):
+    """
+    threads 本のスレッドで seconds 秒間リクエストを送り、
+    (各リクエストの所要時間（ミリ秒）のリスト, バックアップの所要時間（秒）, 負荷が続いている間に完了したか,
+     backup_database の結果) を返します。
+    backup が指定されていれば、負荷をかけている間に別スレッドで実行します。
+    """
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    backup_result = []
+
+    def worker(n):
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+            sess['st_num'] = 'user0'
+        i = n
+        local = []
+        while time.perf_counter() < deadline:
+            question_id = question_ids[i % len(question_ids)]
+            start = time.perf_counter()
+            if i % 4 == 0:
+                client.post(f'/answer/{question_id}', data={'answer': 'ベンチマークの回答です。'})
+            else:
+                client.get(f'/question/{question_id}')
+            local.append((time.perf_counter() - start) * 1000)
+            i += threads
+        with lock:
+            latencies.extend(local)
+
+    def run_backup():
+        # 負荷が安定してから開始します。
+        time.sleep(seconds / 5)
+        start = time.perf_counter()
+        _, result = backup()
+        end = time.perf_counter()
+        # 書き込みが続く限り終わらないバックアップでは、負荷が止まってから完了することになります。
+        backup_result.append((end - start, end < deadline, result))
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    if backup is not None:
+        workers.append(threading.Thread(target=run_backup))
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    if not backup_result:
+        return latencies, None, None, None
+    return (latencies,) + backup_result[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=20000, help='シードする質問数')
+    parser.add_argument('--answers', type=int, default=3, help='質問ごとの回答数')
+    parser.add_argument('--threads', type=int, default=4, help='リクエストを送るスレッド数')
+    parser.add_argument('--seconds', type=float, default=5.0, help='各状況の計測時間（秒）')
+    parser.add_argument('--journal-mode', choices=['delete', 'wal'], default='delete',
+                        help='データベースのジャーナルモード')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # get_db_connection() はカレントディレクトリの hajimeteno.db を使います。
+        create_database(os.path.join(workdir, 'hajimeteno.db'), args.questions, args.answers)
+        os.chdir(workdir)
+        con = sqlite3.connect('hajimeteno.db')
+        con.execute(f"PRAGMA journal_mode = {args.journal_mode}")
+        con.close()
+
+        from app import backup, create_app
+        from app.routes import get_db_connection
+        app = create_app()
+
+        # Geminiカテゴリーの質問に回答するとAPIを呼んでしまうため、それ以外の質問を使います。
+        con = get_db_connection()
+        question_ids = [row['id'] for row in con.execute(
+            "SELECT id FROM questions WHERE category NOT LIKE '%Gemini%' LIMIT 500"
+        )]
+        con.close()
+        print(f"データベース: {os.path.getsize('hajimeteno.db')} bytes / 質問 {args.questions} 件 / journal_mode={args.journal_mode}")
+
+        scenarios = [
+            ('バックアップなし', None),
+            ('ページ単位のバックアップ', lambda: backup.create_snapshot('backups')),
+            ('一括コピーのバックアップ', lambda: backup.create_snapshot('backups', pages=-1, pause=0)),
+        ]
+        print(f"{'scenario':<24}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}{'backup s':>10}"
+              f"{'during load':>13}{'restarts':>10}{'fallback':>10}")
+        for label, task in scenarios:
+            latencies, elapsed, during_load, result = run_load(app, question_ids, args.threads, args.seconds, task)
+            backup_s = f"{elapsed:.2f}" if elapsed is not None else '-'
+            finished = '-' if during_load is None else ('yes' if during_load else 'NO')
+            restarts = '-' if result is None else str(result['restarts'])
+            fallback = '-' if result is None else ('YES' if result['fallback'] else 'no')
+            print(f"{label:<24}{len(latencies):>10}{statistics.median(latencies):>10.2f}"
+                  f"{percentile(latencies, 99):>10.2f}{max(latencies):>10.2f}{backup_s:>10}"
+                  f"{finished:>13}{restarts:>10}{fallback:>10}")
+
+        snapshot = backup.list_snapshots('backups')[-1]
+        integrity, counts = backup.verify_snapshot(snapshot)
+        print(f"\n{os.path.basename(snapshot)}: integrity_check={integrity} {counts}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# benchmarks/bench_compression.py
+"""
+レスポンス圧縮のベンチマークです。
+シードしたデータベースに対して質問一覧・カテゴリー・質問詳細・styles.css を取得し、
+圧縮なし（以前の動作）と gzip / brotli のそれぞれについて、転送バイト数と表示までの時間の目安を計測します。
+
+表示までの時間 = サーバー処理時間 + 転送時間（--mbps の回線を想定） + 展開時間
+
+使い方:
+    python benchmarks/bench_compression.py [--questions 500] [--mbps 5] [--runs 20]
+"""
+
+import argparse
+import gzip
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from seed import ROOT, create_database
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+def decompress(data, encoding):
+    """
+    Content-Encoding に応じて本文を展開します。
+    """
+    if encoding == 'gzip':
+        return gzip.decompress(data)
+    if encoding == 'br':
+        return brotli.decompress(data)
+    return data
+
+def measure(client, path, accept_encoding, runs, mbps):
+    """
+    path を runs 回取得し、転送バイト数・サーバー処理時間・表示までの時間の目安（いずれも中央値）を返します。
+    """
+    server_times, decode_times = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        response = client.get(path, headers={'Accept-Encoding': accept_encoding})
+        body = response.get_data()
+        server_times.append(time.perf_counter() - start)
+
+        encoding = response.headers.get('Content-Encoding', 'identity')
+        start = time.perf_counter()
+        decompress(body, encoding)
+        decode_times.append(time.perf_counter() - start)
+        response.close()
+
+    size = len(body)
+    transfer = size * 8 / (mbps * 1_000_000)
+    render = statistics.median(server_times) + transfer + statistics.median(decode_times)
+    return {
+        'encoding': encoding,
+        'bytes': size,
+        'server_ms': statistics.median(server_times) * 1000,
+        'render_ms': render * 1000,
+        'etag': response.headers.get('ETag'),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--questions', type=int, default=500, help='シードする質問数')
+    parser.add_argument('--answers', type=int, default=5, help='質問ごとの回答数')
+    parser.add_argument('--mbps', type=float, default=5.0, help='想定する回線速度 (Mbps)')
+    parser.add_argument('--runs', type=int, default=20, help='計測回数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # get_db_connection() はカレントディレクトリの hajimeteno.db を使います。
+        create_database(os.path.join(workdir, 'hajimeteno.db'), args.questions, args.answers)
+        os.chdir(workdir)
+
+        # 静的ファイルは作業ディレクトリにコピーしてから事前圧縮版を作成します。
+        static_dir = os.path.join(workdir, 'static')
+        os.makedirs(static_dir)
+        shutil.copy(os.path.join(ROOT, 'static', 'styles.css'), static_dir)
+
+        from app import create_app
+        app = create_app()
+        app.static_folder = static_dir
+        result = app.test_cli_runner().invoke(args=['compress-static'])
+        print(result.output.strip())
+
+        client = app.test_client()
+        with client.session_transaction() as sess:
+            sess['user_id'] = 1
+            sess['st_num'] = 'user0'
+
+        paths = ['/', '/category/データベース', '/question/1', '/static/styles.css']
+        encodings = ['identity', 'gzip'] + (['br'] if brotli is not None else [])
+
+        print(f"\n質問 {args.questions} 件 / 回答 {args.answers} 件ずつ / {args.mbps} Mbps 想定")
+        print(f"{'path':<28}{'encoding':>10}{'bytes':>10}{'server ms':>12}{'render ms':>12}")
+        for path in paths:
+            for accept in encodings:
+                r = measure(client, path, accept, args.runs, args.mbps)
+                print(f"{path:<28}{r['encoding']:>10}{r['bytes']:>10}{r['server_ms']:>12.2f}{r['render_ms']:>12.2f}")
+
+            # 同じ内容の再取得はETagで 304 になり、本文は送られません。
+            # ETagは圧縮方式ごとに異なる場合があるため、最後に計測したものと同じ Accept-Encoding で送ります。
+            revalidated = client.get(path, headers={'Accept-Encoding': accept, 'If-None-Match': r['etag'] or ''})
+            print(f"{path:<28}{'304?':>10}{len(revalidated.get_data()):>10}  (status {revalidated.status_code})")
+            revalidated.close()
+
+if __name__ == '__main__':
+    main()
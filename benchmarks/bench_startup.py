@@ -0,0 +1,88 @@
+# benchmarks/bench_startup.py
+"""
+ワーカー起動時間のベンチマークです。
+新しいPythonプロセスで create_app() を呼び、最初の /healthz と /login が返るまでの時間を計測します。
+比較として、以前の routes.py のように起動時に google.generativeai を読み込んだ場合の時間も計測します。
+
+使い方:
+    python benchmarks/bench_startup.py [--runs 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from seed import ROOT, create_database
+
+# 子プロセスで実行するスクリプトです。起動から最初のレスポンスまでの時間をJSONで出力します。
+CHILD = r"""
+import json, sys, time
+start = time.perf_counter()
+if {eager}:
+    import google.generativeai as genai
+    genai.configure(api_key='dummy')
+    genai.GenerativeModel('gemini-2.0-flash-exp')
+sys.path.insert(0, {root!r})
+from app import create_app
+app = create_app()
+booted = time.perf_counter()
+client = app.test_client()
+healthz = client.get('/healthz')
+login = client.get('/login')
+done = time.perf_counter()
+print(json.dumps({{
+    'boot_ms': (booted - start) * 1000,
+    'first_response_ms': (done - start) * 1000,
+    'healthz_status': healthz.status_code,
+    'login_status': login.status_code,
+    'genai_loaded': 'google.generativeai' in sys.modules,
+}}))
+"""
+
+def run_once(workdir, eager):
+    """
+    新しいプロセスで起動を一回計測し、結果の辞書を返します。
+    """
+    env = dict(os.environ, GEMINI_WARMUP='0')
+    out = subprocess.run(
+        [sys.executable, '-c', CHILD.format(eager=eager, root=ROOT)],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def summarize(label, results):
+    boot = [r['boot_ms'] for r in results]
+    first = [r['first_response_ms'] for r in results]
+    print(f"{label}")
+    print(f"  create_app():        median {statistics.median(boot):8.1f} ms  min {min(boot):8.1f} ms")
+    print(f"  first response:      median {statistics.median(first):8.1f} ms  min {min(first):8.1f} ms")
+    print(f"  /healthz status:     {results[-1]['healthz_status']}")
+    print(f"  genai loaded at boot: {results[-1]['genai_loaded']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10, help='計測回数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        create_database(os.path.join(workdir, 'hajimeteno.db'))
+
+        lazy = [run_once(workdir, eager=False) for _ in range(args.runs)]
+        summarize('遅延初期化 (現在の実装)', lazy)
+
+        try:
+            eager = [run_once(workdir, eager=True) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"起動時初期化の計測をスキップしました (google-generativeai が利用できません): {e.stderr.strip().splitlines()[-1]}")
+            return
+        summarize('起動時初期化 (以前の実装)', eager)
+
+        saved = statistics.median(r['first_response_ms'] for r in eager) - statistics.median(r['first_response_ms'] for r in lazy)
+        print(f"起動時間の短縮: {saved:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/seed.py
+"""
+ベンチマーク用のデータベースを作成するヘルパーです。
+schema.sql ではコメントアウトされている users / answers テーブルも作成します。
+"""
+
+import os
+import random
+import sqlite3
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+def load_schema():
+    """
+    schema.sql を読み込み、コメントアウトされたCREATE文も有効にしたSQLを返します。
+    """
+    with open(os.path.join(ROOT, 'schema.sql'), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    return '\n'.join(line[3:] if line.startswith('-- ') else line for line in lines)
+
+def create_database(path, questions=0, answers_per_question=0, users=20, seed=0):
+    """
+    path にデータベースを作成し、指定された件数のユーザー・質問・回答を投入します。
+    作成したユーザーは 'user0', 'user1', ... 、パスワードは 'pass' です。
+    """
+    # カテゴリー一覧は routes.py と同じものを使います。
+    from app.routes import CATEGORIES
+
+    rng = random.Random(seed)
+    con = sqlite3.connect(path)
+    con.executescript(load_schema())
+    con.executemany(
+        "INSERT INTO users (st_num, pass_w) VALUES (?, ?)",
+        [(f'user{i}', 'pass') for i in range(users)]
+    )
+    for q in range(questions):
+        cur = con.execute(
+            "INSERT INTO questions (date, question_content, category, user_id) VALUES (?, ?, ?, ?)",
+            (f'2025-01-{q % 28 + 1:02d} 12:{q % 60:02d}:00',
+             f'質問{q}: ' + 'ネットワークの課題で分からないところがあります。' * rng.randint(1, 6),
+             rng.choice(CATEGORIES), rng.randint(1, users))
+        )
+        con.executemany(
+            "INSERT INTO answers (question_id, answer_content, user_id, st_num) VALUES (?, ?, ?, ?)",
+            [(cur.lastrowid, f'回答{a}: ' + '教科書の第3章を見直すと良いと思います。' * rng.randint(1, 4),
+              u, f'user{u - 1}')
+             for a in range(answers_per_question)
+             for u in [rng.randint(1, users)]]
+        )
+    con.commit()
+    con.close()